@@ -34,6 +34,7 @@ class Burgers1dTimeDataset(PTDataset):
             pad: int=0,
             channel_dim: int=1,
             download: bool=True,
+            mmap: Optional[bool]=None,
             ):
         """
         Parameters
@@ -70,6 +71,11 @@ class Burgers1dTimeDataset(PTDataset):
             rate at which to subsample each output dimension, by default None
         channel_dim : int, optional
             dimension of saved tensors to index data channels, by default 1
+        mmap : bool, optional
+            whether to memory-map the saved .pt files rather than load
+            them eagerly. Defaults to memory-mapping at resolutions of
+            128 and above, where the full file no longer fits comfortably
+            in RAM next to the training subset.
         """
         # convert root dir to path
         if isinstance(root_dir, str):
@@ -82,6 +88,9 @@ class Burgers1dTimeDataset(PTDataset):
         for res in test_resolutions:
             assert res in available_resolutions, f"Resolutions available: {available_resolutions}, got {res}"
 
+        if mmap is None:
+            mmap = train_resolution >= 128
+
         super().__init__(root_dir=root_dir,
                          n_train=n_train,
                          n_tests=n_tests,
@@ -95,11 +104,26 @@ class Burgers1dTimeDataset(PTDataset):
                          encode_output=True,
                          encoding="channel-wise",
                          channel_dim=channel_dim,
-                         dataset_name="burgers") 
+                         dataset_name="burgers",
+                         mmap=mmap)
 
 # Legacy dataset builders for compatibility
+def _dataloader_kwargs(num_workers, pin_memory):
+    """Shared DataLoader settings: pinning only helps (and costs) on CUDA
+    targets, and worker reuse/prefetch require at least one worker.
+    Batches load into pinned host memory so training code can copy with
+    ``.to(device, non_blocking=True)``."""
+    kwargs = dict(
+        num_workers=num_workers,
+        pin_memory=pin_memory and torch.cuda.is_available(),
+    )
+    if num_workers > 0:
+        kwargs.update(persistent_workers=True, prefetch_factor=2)
+    return kwargs
+
 def load_burgers_1d(
-    data_path, n_train, n_test, batch_train=32, batch_test=100, time=1, grid=[0, 1]
+    data_path, n_train, n_test, batch_train=32, batch_test=100, time=1, grid=[0, 1],
+    num_workers=2, pin_memory=True,
 ):
 
     data_path = Path(data_path).joinpath("burgers.pt").as_posix()
@@ -116,43 +140,49 @@ def load_burgers_1d(
     if grid is not None:
         grid = torch.linspace(grid[0], grid[1], s + 1)[0:-1].view(1, -1)
 
-        grid_train = grid.repeat(n_train, 1)
-        grid_test = grid.repeat(n_test, 1)
-
-        x_train = torch.cat((x_train.unsqueeze(1), grid_train.unsqueeze(1)), 1)
-        x_test = torch.cat((x_test.unsqueeze(1), grid_test.unsqueeze(1)), 1)
+        # stack reads the broadcast grid view directly, so the grid
+        # channel is never materialized per sample
+        x_train = torch.stack([x_train, grid.expand_as(x_train)], dim=1)
+        x_test = torch.stack([x_test, grid.expand_as(x_test)], dim=1)
 
     train_loader = torch.utils.data.DataLoader(
         torch.utils.data.TensorDataset(x_train, y_train),
         batch_size=batch_train,
         shuffle=False,
+        **_dataloader_kwargs(num_workers, pin_memory),
     )
     test_loader = torch.utils.data.DataLoader(
         torch.utils.data.TensorDataset(x_test, y_test),
         batch_size=batch_test,
         shuffle=False,
+        **_dataloader_kwargs(num_workers, pin_memory),
     )
 
     return train_loader, test_loader
 
 def load_burgers_1dtime(
         data_path, n_train, n_test, batch_size=32, batch_size_test=100, 
-        temporal_length=101, spatial_length=128, temporal_subsample=1, 
-        spatial_subsample=1, pad=0):
+        temporal_length=101, spatial_length=128, temporal_subsample=1,
+        spatial_subsample=1, pad=0, num_workers=2, pin_memory=True):
     """
     Load burgers.mat data. Given the initial condition (t=0),
     predict timesteps 1 to temporal_length.
     """
+    # slice each member before converting, so only the subsampled region
+    # is carried past this block. Note .npz members are read through
+    # zipfile and cannot be memory-mapped (np.load ignores mmap_mode),
+    # so the full member array is still decoded once before slicing.
     with np.load(data_path) as data:
-        x_data = data['input']
-        y_data = data['output']
-        visc = data['visc']
+        x_np = np.ascontiguousarray(data['input'][:, :spatial_length:spatial_subsample])
+        y_np = np.ascontiguousarray(data['output'][:, :temporal_length:temporal_subsample, :spatial_length:spatial_subsample])
+        visc = float(data['visc'])
+
+    # astype(copy=False) is a no-op when the file is already float32
+    def _as_f32_tensor(arr):
+        return torch.from_numpy(arr.astype(np.float32, copy=False))
 
-    x_data = torch.from_numpy(x_data.astype(np.float32))
-    x_data = x_data[:, :spatial_length:spatial_subsample]
-    y_data = torch.from_numpy(y_data.astype(np.float32))
-    y_data = y_data[:, :temporal_length:temporal_subsample, :spatial_length:spatial_subsample]
-    visc = torch.from_numpy(visc.astype(np.float32)).item()
+    x_data = _as_f32_tensor(x_np)
+    y_data = _as_f32_tensor(y_np)
 
     x_train = x_data[:n_train]
     y_train = y_data[:n_train]
@@ -174,35 +204,35 @@ def load_burgers_1dtime(
         domain_lengths = [d + incr * pad for d, incr in zip(domain_lengths, incrs)]
         domain_starts = [-incr * pad for incr in incrs]
 
-    grid_x = torch.tensor(np.linspace(domain_starts[0], domain_lengths[0], spatial_length + 1)[:-1], dtype=torch.float)
-    grid_t = torch.tensor(np.linspace(domain_starts[1], domain_lengths[1], temporal_length), dtype=torch.float)
+    grid_x = torch.linspace(domain_starts[0], domain_lengths[0], spatial_length + 1, dtype=torch.float32)[:-1]
+    grid_t = torch.linspace(domain_starts[1], domain_lengths[1], temporal_length, dtype=torch.float32)
 
     grid_x = grid_x.reshape(1, 1, spatial_length)
     grid_t = grid_t.reshape(1, temporal_length, 1)
 
-    x_train = x_train.reshape(n_train, 1, spatial_length).repeat([1, temporal_length, 1])
-    x_test = x_test.reshape(n_test, 1, spatial_length).repeat([1, temporal_length, 1])
-
     # TODO: add option to not have positional encoding
-    x_train = torch.stack([x_train, 
-                           grid_t.repeat([n_train, 1, spatial_length]),
-                           grid_x.repeat([n_train, temporal_length, 1]) 
-                           ], dim=3)
-    x_test = torch.stack([x_test, 
-                          grid_t.repeat([n_test, 1, spatial_length]),
-                          grid_x.repeat([n_test, temporal_length, 1]) 
-                          ], dim=3)
-
-    x_train = x_train.permute(0, 3, 1, 2)
-    x_test = x_test.permute(0, 3, 1, 2)
+    # write the three channels straight into the final (N, 3, T, S) tensor:
+    # expand creates zero-stride views, so the tiled initial condition and
+    # the grids are never materialized outside the output allocation
+    def _with_pos_encoding(x, n_samples):
+        out = torch.empty((n_samples, 3, temporal_length, spatial_length), dtype=torch.float32)
+        out[:, 0] = x.reshape(n_samples, 1, spatial_length).expand(n_samples, temporal_length, spatial_length)
+        out[:, 1] = grid_t.expand(n_samples, temporal_length, spatial_length)
+        out[:, 2] = grid_x.expand(n_samples, temporal_length, spatial_length)
+        return out
+
+    x_train = _with_pos_encoding(x_train, n_train)
+    x_test = _with_pos_encoding(x_test, n_test)
     y_train = y_train.unsqueeze(1)
     y_test = y_test.unsqueeze(1)
 
     train_db = TensorDataset(x_train, y_train)
-    train_loader = torch.utils.data.DataLoader(train_db, batch_size=batch_size, shuffle=False)
+    train_loader = torch.utils.data.DataLoader(train_db, batch_size=batch_size, shuffle=False,
+                                               **_dataloader_kwargs(num_workers, pin_memory))
 
     test_db = TensorDataset(x_test, y_test)
-    test_loader = torch.utils.data.DataLoader(test_db, batch_size=batch_size_test, shuffle=False)
+    test_loader = torch.utils.data.DataLoader(test_db, batch_size=batch_size_test, shuffle=False,
+                                              **_dataloader_kwargs(num_workers, pin_memory))
 
     output_encoder = None
     test_loaders = {'test':test_loader}
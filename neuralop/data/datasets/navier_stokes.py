@@ -99,14 +99,14 @@ class NavierStokesDataset(PTDataset):
         # download darcy data from zenodo archive if passed
         if download:
             files_to_download = []
-            already_downloaded_files = [x for x in root_dir.iterdir()]
             for res in resolutions:
-                if f"nsforcing_train_{res}.pt" not in already_downloaded_files or \
-                f"nsforcing_test_{res}.pt" not in already_downloaded_files:    
+                if not (root_dir / f"nsforcing_train_{res}.pt").exists() or \
+                not (root_dir / f"nsforcing_test_{res}.pt").exists():
                     files_to_download.append(f"nsforcing_{res}.tgz")
-            download_from_zenodo_record(record_id=zenodo_record_id,
-                                        root=root_dir,
-                                        files_to_download=files_to_download)
+            if files_to_download:
+                download_from_zenodo_record(record_id=zenodo_record_id,
+                                            root=root_dir,
+                                            files_to_download=files_to_download)
             
         # once downloaded/if files already exist, init PTDataset
         super().__init__(root_dir=root_dir,
@@ -39,7 +39,8 @@ class PTDataset:
                  encoding="channel-wise",
                  input_subsampling_rate=None,
                  output_subsampling_rate=None,
-                 channel_dim=1,):
+                 channel_dim=1,
+                 mmap: bool=False,):
         """PTDataset
 
         Parameters
@@ -76,8 +77,13 @@ class PTDataset:
             rate at which to subsample each output dimension, by default None
         channel_dim : int, optional
             dimension of saved tensors to index data channels, by default 1
+        mmap : bool, optional
+            whether to memory-map the saved .pt files instead of reading
+            them fully into RAM, by default False. Only the n_train/n_test
+            slices are ever materialized, so this caps peak memory at the
+            requested subset for large files.
         """
-        
+
         if isinstance(root_dir, str):
             root_dir = Path(root_dir)
         
@@ -91,7 +97,8 @@ class PTDataset:
         # Load train data
         
         data = torch.load(
-        Path(root_dir).joinpath(f"{dataset_name}_train_{train_resolution}.pt").as_posix()
+        Path(root_dir).joinpath(f"{dataset_name}_train_{train_resolution}.pt").as_posix(),
+        mmap=mmap,
         )
 
         # optionally subsample along data indices
@@ -169,7 +176,8 @@ class PTDataset:
             print(
                 f"Loading test db for resolution {res} with {n_test} samples "
             )
-            data = torch.load(Path(root_dir).joinpath(f"{dataset_name}_test_{res}.pt").as_posix())
+            data = torch.load(Path(root_dir).joinpath(f"{dataset_name}_test_{res}.pt").as_posix(),
+                              mmap=mmap)
 
             # optionally subsample along data indices
             test_input_indices = [slice(0, n_test, None)] + [slice(None, None, rate) for rate in input_subsampling_rate] 
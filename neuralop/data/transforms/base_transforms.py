@@ -19,18 +19,6 @@ class Transform(torch.nn.Module):
     def inverse_transform(self):
         pass
 
-    @abstractmethod
-    def cuda(self):
-        pass
-
-    @abstractmethod
-    def cpu(self):
-        pass
-
-    @abstractmethod
-    def to(self, device):
-        pass
-
 class CompositeTransform(Transform):
     def __init__(self, transforms: List[Transform]):
         """Composite transform composes a list of
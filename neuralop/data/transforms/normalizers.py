@@ -1,33 +1,45 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 
 from ...utils import count_tensor_params
 from .base_transforms import Transform, DictTransform
 import torch
 
+_sentinel = object()
+
+
+def _prefetch(iterable, n_prefetch=2):
+    """Yield items from ``iterable``, pulling ahead on a background thread.
+
+    Keeps up to ``n_prefetch`` items in flight so that a disk-backed
+    dataset's I/O overlaps with the statistics updates consuming it.
+    """
+    it = iter(iterable)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = deque(
+            pool.submit(next, it, _sentinel) for _ in range(max(n_prefetch, 1))
+        )
+        while pending:
+            item = pending.popleft().result()
+            if item is _sentinel:
+                break
+            pending.append(pool.submit(next, it, _sentinel))
+            yield item
+
 class Normalizer(Transform):
     def __init__(self, mean, std, eps=1e-6):
-        self.mean = mean
-        self.std = std
+        super().__init__()
+        self.register_buffer("mean", mean)
+        self.register_buffer("std", std)
         self.eps = eps
 
     def transform(self, data):
         return (data - self.mean)/(self.std + self.eps)
-    
+
     def inverse_transform(self, data):
         return (data * (self.std + self.eps)) + self.mean
 
-    def to(self, device):
-        self.mean = self.mean.to(device)
-        self.std = self.std.to(device)
-    
-    def cuda(self):
-        self.mean = self.mean.cuda()
-        self.std = self.std.cuda()
-
-    def cpu(self):
-        self.mean = self.mean.cpu()
-        self.std = self.std.cpu()
-
 class UnitGaussianNormalizer(Transform):
     """
     UnitGaussianNormalizer normalizes data to be zero mean and unit std.
@@ -77,6 +89,10 @@ class UnitGaussianNormalizer(Transform):
             dim = [dim]
         self.dim = dim
         self.n_elements = 0
+        # typed copies of (mean, scale, 1/scale), keyed by the dtype and
+        # device of the data passing through: under autocast the stats
+        # are cast once instead of upcasting every activation tensor
+        self._typed_stats = {}
 
     def fit(self, data_batch):
         self.update_mean_std(data_batch)
@@ -120,6 +136,9 @@ class UnitGaussianNormalizer(Transform):
                 torch.sum(data_batch**2, dim=dim, keepdim=True) / self.n_elements
             )
             self.std = torch.std(data_batch, dim=self.dim, keepdim=True)
+        # centered second moment, carried for stable incremental updates
+        self._m2 = self.std**2 * (self.n_elements - 1)
+        self._typed_stats = {}
 
     def incremental_update_mean_std(self, data_batch):
         if self.mask is None:
@@ -130,46 +149,56 @@ class UnitGaussianNormalizer(Transform):
             n_elements = torch.count_nonzero(self.mask, dim=dim) * data_batch.shape[0]
             data_batch[:, self.mask == 1] = 0
 
-        self.mean = (1.0 / (self.n_elements + n_elements)) * (
-            self.n_elements * self.mean + torch.sum(data_batch, dim=dim, keepdim=True)
-        )
-        self.squared_mean = (1.0 / (self.n_elements + n_elements)) * (
-            self.n_elements * self.squared_mean
-            + torch.sum(data_batch**2, dim=dim, keepdim=True)
+        # Chan et al. parallel merge of (mean, M2) pairs: one pass and
+        # numerically stable, unlike the E[x^2] - E[x]^2 form, which
+        # cancels catastrophically for large-magnitude data
+        batch_mean = torch.sum(data_batch, dim=dim, keepdim=True) / n_elements
+        batch_m2 = torch.sum((data_batch - batch_mean) ** 2, dim=dim, keepdim=True)
+
+        delta = batch_mean - self.mean
+        total = self.n_elements + n_elements
+        self.mean = self.mean + delta * (n_elements / total)
+        self._m2 = self._m2 + batch_m2 + delta**2 * (
+            self.n_elements * n_elements / total
         )
-        self.n_elements += n_elements
-
-        # 1/(n_i + n_j) * (n_i * sum(x_i^2)/n_i + sum(x_j^2) - (n_i*sum(x_i)/n_i + sum(x_j))^2)
-        # = 1/(n_i + n_j)  * (sum(x_i^2) + sum(x_j^2) - sum(x_i)^2 - 2sum(x_i)sum(x_j) - sum(x_j)^2))
-        # multiply by (n_i + n_j) / (n_i + n_j + 1) for unbiased estimator
-        self.std = torch.sqrt(self.squared_mean - self.mean**2) * self.n_elements / (self.n_elements - 1)
+        self.n_elements = total
+
+        self.std = torch.sqrt(self._m2 / (self.n_elements - 1))
+        self._typed_stats = {}
+
+    def _load_from_state_dict(self, *args, **kwargs):
+        # loading copies into mean/std in place, which would leave the
+        # typed cache holding stale scale/inv_scale snapshots
+        self._typed_stats = {}
+        super()._load_from_state_dict(*args, **kwargs)
+
+    def _stats_for(self, x):
+        """Return ``(mean, scale, inv_scale)`` matching x's dtype and device"""
+        key = (x.dtype, x.device)
+        stats = self._typed_stats.get(key)
+        if stats is None:
+            scale = (self.std + self.eps).to(dtype=x.dtype, device=x.device)
+            stats = (
+                self.mean.to(dtype=x.dtype, device=x.device),
+                scale,
+                1.0 / scale,
+            )
+            self._typed_stats[key] = stats
+        return stats
 
     def transform(self, x):
-        return (x - self.mean) / (self.std + self.eps)
+        mean, _, inv_scale = self._stats_for(x)
+        return (x - mean) * inv_scale
 
     def inverse_transform(self, x):
-        return x * (self.std + self.eps) + self.mean
+        mean, scale, _ = self._stats_for(x)
+        return x * scale + mean
 
     def forward(self, x):
         return self.transform(x)
 
-    def cuda(self):
-        self.mean = self.mean.cuda()
-        self.std = self.std.cuda()
-        return self
-
-    def cpu(self):
-        self.mean = self.mean.cpu()
-        self.std = self.std.cpu()
-        return self
-
-    def to(self, device):
-        self.mean = self.mean.to(device)
-        self.std = self.std.to(device)
-        return self
-
     @classmethod
-    def from_dataset(cls, dataset, dim=None, keys=None, mask=None):
+    def from_dataset(cls, dataset, dim=None, keys=None, mask=None, n_prefetch=2):
         """Return a dictionary of normalizer instances, fitted on the given dataset
 
         Parameters
@@ -182,13 +211,16 @@ class UnitGaussianNormalizer(Transform):
             * Otherwise, must include batch-dimensions and all over dims to reduce over
         keys : str list or None
             if not None, a normalizer is instanciated only for the given keys
+        n_prefetch : int, default is 2
+            number of samples fetched ahead on a background thread while
+            the running statistics are updated
         """
-        for i, data_dict in enumerate(dataset):
-            if not i:
+        instances = None
+        for data_dict in _prefetch(dataset, n_prefetch):
+            if instances is None:
                 if not keys:
                     keys = data_dict.keys()
-        instances = {key: cls(dim=dim, mask=mask) for key in keys}
-        for i, data_dict in enumerate(dataset):
+                instances = {key: cls(dim=dim, mask=mask) for key in keys}
             for key, sample in data_dict.items():
                 if key in keys:
                     instances[key].partial_fit(sample.unsqueeze(0))
@@ -1,5 +1,6 @@
 from typing import List, Union
 
+import torch
 from torch import nn
 from torch.nn import functional as F
 
@@ -43,6 +44,12 @@ class DomainPadding(nn.Module):
         # dict(f'{resolution}'=indices_to_unpad) such that unpadded = x[indices]
         self._unpad_indices = dict()
 
+        # dict(f'{resolution}'=indices of x inside its padded frame)
+        self._interior_indices = dict()
+
+        # cached padded output buffers, reused at inference time
+        self._pad_buffers = dict()
+
     def forward(self, x):
         """forward pass: pad the input"""
         self.pad(x)
@@ -73,7 +80,7 @@ class DomainPadding(nn.Module):
 
         try:
             padding = self._padding[f"{resolution}"]
-            return F.pad(x, padding, mode="constant")
+            return self._apply_pad(x, padding, resolution)
 
         except KeyError:
             padding = [round(p * r) for (p, r) in zip(self.domain_padding, resolution)]
@@ -92,6 +99,7 @@ class DomainPadding(nn.Module):
 
             # padding is being applied in reverse order
             # (so we must reverse the padding list)
+            pad_amounts = padding
             padding = padding[::-1]
 
             
@@ -131,9 +139,17 @@ class DomainPadding(nn.Module):
             else:
                 raise ValueError(f"Got padding_mode={self.padding_mode}")
 
+            # where the unpadded input sits inside its padded frame,
+            # used to refresh reused output buffers
+            if self.padding_mode == "symmetric":
+                interior = tuple(slice(p, -p if p else None) for p in pad_amounts)
+            else:
+                interior = tuple(slice(None, -p if p else None) for p in pad_amounts)
+            self._interior_indices[f"{resolution}"] = (Ellipsis,) + interior
+
             self._padding[f"{resolution}"] = padding
 
-            padded = F.pad(x, padding, mode="constant")
+            padded = self._apply_pad(x, padding, resolution)
 
             output_shape = padded.shape[2:]
 
@@ -145,6 +161,42 @@ class DomainPadding(nn.Module):
 
             return padded
 
+    # at most this many cached output buffers are retained: one per
+    # (shape, dtype, device) actually in rotation, with headroom for a
+    # partial last batch per resolution
+    _max_pad_buffers = 8
+
+    def _apply_pad(self, x, padding, resolution):
+        """Pad ``x``, reusing a cached output buffer at inference time.
+
+        Under autograd every forward must produce a fresh tensor, so the
+        buffer is only reused when gradients are off. Buffers are also
+        never cached under ``torch.inference_mode()``: an inference
+        tensor cannot be updated in place once inference mode is exited,
+        so a buffer created there would poison later ``no_grad`` calls.
+        The zero frame of a reused buffer is never overwritten, so
+        refreshing it is a single interior copy instead of a new
+        allocation per forward.
+        """
+        if (torch.is_grad_enabled() and x.requires_grad) or (
+            torch.is_inference_mode_enabled()
+        ):
+            return F.pad(x, padding, mode="constant")
+
+        key = (tuple(x.shape), x.dtype, x.device)
+        buf = self._pad_buffers.get(key)
+        if buf is None:
+            buf = F.pad(x, padding, mode="constant")
+            if len(self._pad_buffers) >= self._max_pad_buffers:
+                # evict the oldest entry so varying batch sizes (e.g. a
+                # partial last batch per loader) cannot grow the cache
+                # without bound
+                self._pad_buffers.pop(next(iter(self._pad_buffers)))
+            self._pad_buffers[key] = buf
+        else:
+            buf[self._interior_indices[f"{resolution}"]] = x
+        return buf
+
     def unpad(self, x):
         """Remove the padding from padding inputs"""
         unpad_indices = self._unpad_indices[f"{list(x.shape[2:])}"]
@@ -2,7 +2,24 @@ from typing import Literal
 import importlib
 
 import torch
-from torch import einsum
+
+# optional Numba kernel for the CPU fallback: reduces each
+# neighborhood in parallel in one compiled pass over src
+try:
+    from numba import njit, prange
+
+    @njit(parallel=True, fastmath=True)
+    def _segment_csr_numba(src, indptr, out, do_mean):
+        for i in prange(indptr.shape[0] - 1):
+            start = indptr[i]
+            end = indptr[i + 1]
+            for j in range(start, end):
+                out[i] += src[j]
+            if do_mean and end > start:
+                out[i] /= end - start
+
+except ImportError:
+    _segment_csr_numba = None
 
 def segment_csr(
     src: torch.Tensor,
@@ -56,6 +73,8 @@ def segment_csr(
         if src.ndim == 3:
             batched = True
             point_dim = 1
+            # indptr is shared across the batch dim
+            indptr = indptr[0]
         else:
             batched = False
             point_dim = 0
@@ -63,29 +82,64 @@ def segment_csr(
         # if batched, shape [b, n_out, channels]
         # otherwise shape [n_out, channels]
         output_shape = list(src.shape)
-        n_out = indptr.shape[point_dim] - 1
+        n_out = indptr.shape[0] - 1
         output_shape[point_dim] = n_out
 
-        out = torch.zeros(output_shape, device=src.device)
+        # fast path: if every neighborhood is a singleton, the reduction
+        # is the identity for both sum and mean. The shape check keeps
+        # the device-syncing .all() off cases that can't qualify.
+        if n_out == src.shape[point_dim]:
+            n_nbrs = indptr[1:] - indptr[:-1]
+            if bool((n_nbrs == 1).all()):
+                return src.clone()
+
+        if (
+            _segment_csr_numba is not None
+            and not batched
+            and src.device.type == "cpu"
+            and not src.requires_grad
+        ):
+            out = torch.zeros(output_shape, dtype=src.dtype)
+            _segment_csr_numba(
+                src.contiguous().numpy(),
+                indptr.numpy(),
+                out.numpy(),
+                reduce == "mean",
+            )
+            return out
 
-        for i in range(n_out):
-            # reduce all indices pointed to in indptr from src into out
-            if batched:
-                from_idx = (slice(None), slice(indptr[0,i], indptr[0,i+1]))
-                ein_str = 'bio->bo'
-                start = indptr[0,i]
-                n_nbrs = indptr[0,i+1] - start
-                to_idx = (slice(None), i)
+        n_nbrs = indptr[1:] - indptr[:-1]
+
+        if reduce == "mean":
+            # one reciprocal per segment, reused as a multiply below;
+            # empty neighborhoods get weight zero instead of inf
+            inv_n = torch.where(
+                n_nbrs > 0,
+                1.0 / n_nbrs.to(src.dtype),
+                torch.zeros((), dtype=src.dtype, device=src.device),
+            )
+
+        if not batched:
+            # the CSR reduction is exactly S @ src for a sparse operator S
+            # with one row per neighborhood, dispatched to cuSPARSE/MKL
+            nnz = int(indptr[-1])
+            col = torch.arange(nnz, device=src.device)
+            if reduce == "mean":
+                vals = torch.repeat_interleave(inv_n, n_nbrs)
             else:
-                from_idx = slice(indptr[i], indptr[i+1])
-                ein_str = 'io->o'
-                start = indptr[i]
-                n_nbrs = indptr[i+1] - start
-                to_idx = i
-            src_from = src[from_idx]
-            if n_nbrs > 0:
-                to_reduce = einsum(ein_str, src_from)
-                if reduce == "mean":
-                    to_reduce /= n_nbrs
-                out[to_idx] += to_reduce
+                vals = torch.ones(nnz, device=src.device, dtype=src.dtype)
+            S = torch.sparse_csr_tensor(
+                indptr, col, vals, size=(n_out, src.shape[0])
+            )
+            return S @ src
+
+        # each neighborhood sum is a difference of prefix sums over src:
+        # two gathers over one cumsum replace any per-segment reduction
+        zero_row = torch.zeros_like(src.narrow(point_dim, 0, 1))
+        cs = torch.cat([zero_row, src], dim=point_dim).cumsum(point_dim)
+        out = cs.index_select(point_dim, indptr[1:]) - cs.index_select(
+            point_dim, indptr[:-1]
+        )
+        if reduce == "mean":
+            out = out * inv_n.unsqueeze(-1)
         return out
@@ -1,5 +1,6 @@
 import torch
 from torch import nn
+import torch.nn.functional as F
 
 
 def skip_connection(
@@ -116,8 +117,14 @@ class Flattened1dConv(nn.Module):
         size = list(x.shape)
         # flatten everything past 1st data dim
         x = x.view(*size[:2], -1)
-        x = self.conv(x)
+        # a kernel-size-1 conv is a per-position linear map: run it as
+        # one GEMM over channel-last data instead of conv dispatch
+        if self.conv.kernel_size == (1,):
+            x = F.linear(x.movedim(1, -1), self.conv.weight.squeeze(-1), self.conv.bias)
+            x = x.movedim(-1, 1)
+        else:
+            x = self.conv(x)
         # reshape x into an Nd tensor b, c, x1, x2, ...
-        x = x.view(size[0], self.conv.out_channels, *size[2:])
+        x = x.reshape(size[0], self.conv.out_channels, *size[2:])
         return x
         
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import List, Optional, Tuple, Union
 
 from ..utils import validate_scaling_factor
@@ -5,6 +6,7 @@ from ..utils import validate_scaling_factor
 import torch
 from torch import nn
 
+import opt_einsum as oe
 import tensorly as tl
 from tensorly.plugins import use_opt_einsum
 from tltorch.factorized_tensors.core import FactorizedTensor
@@ -18,6 +20,17 @@ use_opt_einsum("optimal")
 einsum_symbols = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
 
+@lru_cache(maxsize=32)
+def _contract_expression(eq, *shapes):
+    """Plan a contraction once per (equation, operand shapes) pair.
+
+    opt_einsum re-runs its path search on every ``contract`` call; for
+    the factorized weights the operand shapes are fixed after build, so
+    the planned expression can simply be replayed each forward.
+    """
+    return oe.contract_expression(eq, *shapes, optimize="optimal")
+
+
 def _contract_dense(x, weight, separable=False):
     order = tl.ndim(x)
     # batch-size, in_channels, x, y...
@@ -98,7 +111,9 @@ def _contract_tucker(x, tucker_weight, separable=False):
     if x.dtype == torch.complex32:
         return einsum_complexhalf(eq, x, tucker_weight.core, *tucker_weight.factors)
     else:
-        return tl.einsum(eq, x, tucker_weight.core, *tucker_weight.factors)
+        operands = (x, tucker_weight.core, *tucker_weight.factors)
+        expr = _contract_expression(eq, *(tuple(t.shape) for t in operands))
+        return expr(*operands)
 
 
 def _contract_tt(x, tt_weight, separable=False):
@@ -1,5 +1,6 @@
-from functools import partialmethod
+import inspect
 
+import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
@@ -99,8 +100,15 @@ class FNO(BaseModel, name='FNO'):
     conv_module : BaseConv, optional
         Module to use for convolutions in FNO, by default SpectralConv
     complex_data: bool, optional
-        whether FNO data takes on complex values 
+        whether FNO data takes on complex values
         in the spatial domain, by default False
+    compile_forward : bool, optional
+        if True, wraps the forward pass with ``torch.compile`` so that
+        pointwise ops across the layer loop are fused, by default False
+    autocast_lifting_proj : bool, optional
+        if True, runs the lifting and projection blocks under bfloat16
+        autocast while keeping the spectral convolutions in fp32,
+        by default False. Ignored when complex_data is True.
     """
 
     def __init__(
@@ -136,6 +144,8 @@ class FNO(BaseModel, name='FNO'):
         domain_padding_mode="one-sided",
         conv_module=SpectralConv,
         complex_data=False,
+        compile_forward=False,
+        autocast_lifting_proj=False,
         **kwargs
     ):
         super().__init__()
@@ -270,6 +280,34 @@ class FNO(BaseModel, name='FNO'):
         if self.complex_data:
             self.projection = ComplexValued(self.projection)
 
+        # autocast does not support complex tensors
+        self.autocast_lifting_proj = autocast_lifting_proj and not complex_data
+
+        # static tuple of layer indices: iterating a constant lets
+        # torch.compile unroll the block loop into one fused graph
+        self._layer_indices = tuple(range(self.n_layers))
+
+        if compile_forward:
+            # fuses the pointwise ops around and inside the block loop.
+            # Shape handling is left to torch.compile's default (compile
+            # static, recompile then generalize on a shape change):
+            # forcing dynamic=True pushes symbolic shapes into
+            # opt_einsum's path planning, which Dynamo cannot trace
+            self.forward = torch.compile(self.forward)
+
+    def _lift_or_project(self, module, x):
+        """Run lifting/projection under bf16 autocast when enabled.
+
+        These blocks are dense channel-mixing GEMMs that tolerate reduced
+        precision; the result is cast back to fp32 so the FFTs in the
+        spectral convolutions keep full accuracy.
+        """
+        if not self.autocast_lifting_proj:
+            return module(x)
+        with torch.autocast(device_type=x.device.type, dtype=torch.bfloat16):
+            x = module(x)
+        return x.float()
+
     def forward(self, x, output_shape=None, **kwargs):
         """TFNO's forward pass
 
@@ -293,18 +331,18 @@ class FNO(BaseModel, name='FNO'):
         if self.positional_embedding is not None:
             x = self.positional_embedding(x)
         
-        x = self.lifting(x)
+        x = self._lift_or_project(self.lifting, x)
 
         if self.domain_padding is not None:
             x = self.domain_padding.pad(x)
 
-        for layer_idx in range(self.n_layers):
+        for layer_idx in self._layer_indices:
             x = self.fno_blocks(x, layer_idx, output_shape=output_shape[layer_idx])
 
         if self.domain_padding is not None:
             x = self.domain_padding.unpad(x)
 
-        x = self.projection(x)
+        x = self._lift_or_project(self.projection, x)
 
         return x
 
@@ -566,19 +604,32 @@ def partialclass(new_name, cls, *args, **kwargs):
 
     2. the new class will be a functools object and one cannot inherit from it.
 
-    Instead, here, we define dynamically a new class, inheriting from the existing one.
+    Instead we define a plain subclass whose ``__init__`` fills in the
+    frozen keyword defaults and defers to the parent, avoiding the extra
+    descriptor indirection of the previous ``partialmethod`` construction.
+    The new name is passed at class creation so ``BaseModel``'s
+    registration sees it, and ``__signature__`` exposes the parent's
+    parameters (with the frozen defaults substituted) for ``BaseModel``'s
+    keyword introspection.
     """
-    __init__ = partialmethod(cls.__init__, *args, **kwargs)
-    new_class = type(
-        new_name,
-        (cls,),
-        {
-            "__init__": __init__,
-            "__doc__": cls.__doc__,
-            "forward": cls.forward,
-        },
-    )
-    return new_class
+
+    class _PartialClass(cls, name=new_name):
+        def __init__(self, *inner_args, **inner_kwargs):
+            for key, value in kwargs.items():
+                inner_kwargs.setdefault(key, value)
+            super().__init__(*args, *inner_args, **inner_kwargs)
+
+    _PartialClass.__name__ = new_name
+    _PartialClass.__qualname__ = new_name
+    _PartialClass.__doc__ = cls.__doc__
+    base_sig = inspect.signature(cls.__init__)
+    new_params = [
+        p.replace(default=kwargs[p_name]) if p_name in kwargs else p
+        for p_name, p in base_sig.parameters.items()
+        if p_name != "self"
+    ]
+    _PartialClass.__signature__ = base_sig.replace(parameters=new_params)
+    return _PartialClass
 
 
 TFNO = partialclass("TFNO", FNO, factorization="Tucker")
@@ -93,6 +93,18 @@ class UNO(nn.Module):
         How to perform domain padding, by default 'one-sided'
     fft_norm : str, optional
         by default 'forward'
+    compile_forward : bool, optional
+        if True, wraps the forward pass with ``torch.compile`` so that
+        pointwise ops across the layer loop are fused, by default False
+    autocast_lifting_proj : bool, optional
+        if True, runs the lifting and projection blocks under bfloat16
+        autocast while keeping the spectral convolutions in fp32,
+        by default False
+    horizontal_skip_resample_mode : {None, 'nearest'}, optional
+        if 'nearest', horizontal skip activations are rescaled with
+        nearest-neighbor interpolation, a much cheaper gather-only
+        kernel than the default smooth resampling. By default None,
+        which keeps the generic spectral/bicubic resample
 
     [1] : U-NO: U-shaped Neural Operators, Md Ashiqur Rahman, Zachary E Ross, Kamyar Azizzadenesheli, TMLR 2022
     """
@@ -133,6 +145,9 @@ class UNO(nn.Module):
         domain_padding_mode="one-sided",
         fft_norm="forward",
         normalizer=None,
+        compile_forward=False,
+        autocast_lifting_proj=False,
+        horizontal_skip_resample_mode=None,
         verbose=False,
         **kwargs
     ):
@@ -253,7 +268,10 @@ class UNO(nn.Module):
             n_dim=self.n_dim,
         )
         self.fno_blocks = nn.ModuleList([])
-        self.horizontal_skips = torch.nn.ModuleDict({})
+        # integer-indexed list with a layer_idx -> position map, so
+        # forward avoids a str() key build and ModuleDict hash per layer
+        self.horizontal_skips = nn.ModuleList([])
+        self._skip_idx_of = {}
         prev_out = self.hidden_channels
 
         for i in range(self.n_layers):
@@ -291,11 +309,14 @@ class UNO(nn.Module):
             )
 
             if i in self.horizontal_skips_map.values():
-                self.horizontal_skips[str(i)] = skip_connection(
-                    self.uno_out_channels[i],
-                    self.uno_out_channels[i],
-                    skip_type=horizontal_skip,
-                    n_dim=self.n_dim,
+                self._skip_idx_of[i] = len(self.horizontal_skips)
+                self.horizontal_skips.append(
+                    skip_connection(
+                        self.uno_out_channels[i],
+                        self.uno_out_channels[i],
+                        skip_type=horizontal_skip,
+                        n_dim=self.n_dim,
+                    )
                 )
 
             prev_out = self.uno_out_channels[i]
@@ -309,11 +330,83 @@ class UNO(nn.Module):
             non_linearity=non_linearity,
         )
 
+        # resample axes and the per-shape scaling ratios are invariant
+        # for a fixed input shape, so compute the axes once and cache
+        # ratios across forward passes keyed on the shapes involved
+        self._resample_axes = list(range(-self.n_dim, 0))
+        self._resample_cache = {}
+
+        # O(1) membership tests for the per-layer skip checks in forward:
+        # .values() membership in particular is a linear scan per layer
+        self._skip_dst = frozenset(self.horizontal_skips_map.keys())
+        self._skip_src = frozenset(self.horizontal_skips_map.values())
+
+        # static per-layer iteration schedule: iterating constants lets
+        # torch.compile resolve the skip branches at trace time and
+        # unroll the block loop into one fused graph
+        self._layer_indices = tuple(range(self.n_layers))
+        self._has_skip_in = tuple(i in self._skip_dst for i in self._layer_indices)
+        self._has_skip_out = tuple(i in self._skip_src for i in self._layer_indices)
+
+        # number of consumers per skip source, so forward can free each
+        # stored activation as soon as its last consumer has read it
+        self._skip_consumers = {}
+        for src in self.horizontal_skips_map.values():
+            self._skip_consumers[src] = self._skip_consumers.get(src, 0) + 1
+
+        self.autocast_lifting_proj = autocast_lifting_proj
+
+        if horizontal_skip_resample_mode not in (None, "nearest"):
+            raise ValueError(
+                f"Error: expected horizontal_skip_resample_mode to be one of "
+                f"None, 'nearest', got {horizontal_skip_resample_mode}"
+            )
+        self.horizontal_skip_resample_mode = horizontal_skip_resample_mode
+
+        if compile_forward:
+            # fuses the pointwise ops around and inside the block loop.
+            # Shape handling is left to torch.compile's default (compile
+            # static, recompile then generalize on a shape change):
+            # forcing dynamic=True pushes symbolic shapes into
+            # opt_einsum's path planning, which Dynamo cannot trace
+            self.forward = torch.compile(self.forward)
+
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        """Remap horizontal-skip keys from checkpoints saved before the
+        ModuleDict -> ModuleList port, which keyed each skip by its source
+        layer index rather than its position in the list."""
+        skip_prefix = prefix + "horizontal_skips."
+        skip_keys = [k for k in state_dict if k.startswith(skip_prefix)]
+        indices = {int(k[len(skip_prefix):].split(".", 1)[0]) for k in skip_keys}
+        # layer-index and position key sets only differ when skip sources
+        # do not start at 0; identical sets need (and tolerate) no remap
+        if indices == set(self._skip_idx_of) and indices != set(
+            self._skip_idx_of.values()
+        ):
+            for key in skip_keys:
+                layer_idx, rest = key[len(skip_prefix):].split(".", 1)
+                new_key = f"{skip_prefix}{self._skip_idx_of[int(layer_idx)]}.{rest}"
+                state_dict[new_key] = state_dict.pop(key)
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+
+    def _lift_or_project(self, module, x):
+        """Run lifting/projection under bf16 autocast when enabled.
+
+        These blocks are dense channel-mixing GEMMs that tolerate reduced
+        precision; the result is cast back to fp32 so the FFTs in the
+        spectral convolutions keep full accuracy.
+        """
+        if not self.autocast_lifting_proj:
+            return module(x)
+        with torch.autocast(device_type=x.device.type, dtype=torch.bfloat16):
+            x = module(x)
+        return x.float()
+
     def forward(self, x, **kwargs):
         if self.positional_embedding is not None:
             x = self.positional_embedding(x)
-        
-        x = self.lifting(x)
+
+        x = self._lift_or_project(self.lifting, x)
 
         if self.domain_padding is not None:
             x = self.domain_padding.pad(x)
@@ -323,31 +416,60 @@ class UNO(nn.Module):
         ]
 
         skip_outputs = {}
+        skip_reads_left = dict(self._skip_consumers)
         cur_output = None
-        for layer_idx in range(self.n_layers):
-            
-            if layer_idx in self.horizontal_skips_map.keys():
-                skip_val = skip_outputs[self.horizontal_skips_map[layer_idx]]
-                output_scaling_factors = [
-                    m / n for (m, n) in zip(x.shape, skip_val.shape)
-                ]
-                output_scaling_factors = output_scaling_factors[-1 * self.n_dim :]
-                t = resample(
-                    skip_val, output_scaling_factors, list(range(-self.n_dim, 0))
+        for layer_idx in self._layer_indices:
+
+            if self._has_skip_in[layer_idx]:
+                skip_src = self.horizontal_skips_map[layer_idx]
+                skip_val = skip_outputs[skip_src]
+                # release the stored activation once its last consumer
+                # has read it, so the allocator can reuse the memory
+                skip_reads_left[skip_src] -= 1
+                if skip_reads_left[skip_src] == 0:
+                    del skip_outputs[skip_src]
+                cache_key = (tuple(x.shape), tuple(skip_val.shape))
+                output_scaling_factors = self._resample_cache.get(cache_key)
+                if output_scaling_factors is None:
+                    output_scaling_factors = [
+                        m / n for (m, n) in zip(x.shape, skip_val.shape)
+                    ][-1 * self.n_dim :]
+                    self._resample_cache[cache_key] = output_scaling_factors
+                if all(r == 1 for r in output_scaling_factors):
+                    # same resolution: skip the interpolation entirely
+                    t = skip_val
+                elif self.horizontal_skip_resample_mode == "nearest":
+                    # cheap gather-only kernel for the typical fixed
+                    # power-of-2 U-shape ratios
+                    t = F.interpolate(
+                        skip_val, size=x.shape[-self.n_dim :], mode="nearest"
+                    )
+                else:
+                    t = resample(skip_val, output_scaling_factors, self._resample_axes)
+                # merge into one preallocated buffer rather than torch.cat,
+                # so the concat output is the only allocation on this path
+                n_x = x.shape[1]
+                merged = torch.empty(
+                    (x.shape[0], n_x + t.shape[1], *x.shape[2:]),
+                    device=x.device, dtype=x.dtype,
                 )
-                x = torch.cat([x, t], dim=1)
+                merged[:, :n_x].copy_(x)
+                merged[:, n_x:].copy_(t)
+                x = merged
 
             if layer_idx == self.n_layers - 1:
                 cur_output = output_shape
             x = self.fno_blocks[layer_idx](x, output_shape=cur_output)
 
-            if layer_idx in self.horizontal_skips_map.values():
-                skip_outputs[layer_idx] = self.horizontal_skips[str(layer_idx)](x)
+            if self._has_skip_out[layer_idx]:
+                skip_outputs[layer_idx] = self.horizontal_skips[
+                    self._skip_idx_of[layer_idx]
+                ](x)
 
 
         if self.domain_padding is not None:
             x = self.domain_padding.unpad(x)
         
 
-        x = self.projection(x)
+        x = self._lift_or_project(self.projection, x)
         return x
\ No newline at end of file
@@ -1,5 +1,5 @@
 from ..utils import get_wandb_api_key, wandb_login
-from ..utils import count_model_params, count_tensor_params
+from ..utils import count_model_params, count_tensor_params, spectrum_2d
 from pathlib import Path
 import pytest
 
@@ -63,6 +63,30 @@ def test_count_tensor_params():
 
 
 
+def test_spectrum_2d():
+    n = 16
+    idx = torch.arange(n, dtype=torch.float64)
+    x, y = torch.meshgrid(idx, idx, indexing='ij')
+
+    # A single Fourier mode at wavenumbers (2, 3) lands all of its power
+    # in shell 2 + 3, i.e. index 4 of the 0-based spectrum
+    signal = torch.cos(2 * torch.pi * (2 * x + 3 * y) / n).reshape(1, -1)
+    spectrum = spectrum_2d(signal, n)
+    expected = torch.zeros(n, dtype=torch.float64)
+    expected[4] = (n**2 / 2) ** 2
+    torch.testing.assert_close(spectrum, expected)
+
+    # Two modes in the same shell add their powers |X_k|^2: the opposite
+    # signs must not cancel within the shell
+    signal = (
+        torch.cos(2 * torch.pi * (1 * x + 4 * y) / n)
+        - torch.cos(2 * torch.pi * (4 * x + 1 * y) / n)
+    ).reshape(1, -1)
+    spectrum = spectrum_2d(signal, n)
+    assert spectrum[4] == pytest.approx(2 * (n**2 / 2) ** 2)
+    assert spectrum[:4].abs().max() < 1e-6
+
+
 def test_get_wandb_api_key():
     # Make sure no env var key set
     os.environ.pop("WANDB_API_KEY", None)
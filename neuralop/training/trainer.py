@@ -1,5 +1,4 @@
 import torch
-from torch.cuda import amp
 from torch import nn
 from timeit import default_timer
 from pathlib import Path
@@ -31,6 +30,7 @@ class Trainer:
         wandb_log: bool=False,
         device: str='cpu',
         mixed_precision: bool=False,
+        mixed_precision_dtype: torch.dtype=None,
         data_processor: nn.Module=None,
         eval_interval: int=1,
         log_output: bool=False,
@@ -47,6 +47,10 @@ class Trainer:
         device : torch.device, or str 'cpu' or 'cuda'
         mixed_precision : bool, default is False
             whether to use torch.autocast to compute mixed precision
+        mixed_precision_dtype : torch.dtype, default is None
+            dtype to autocast to. If None, uses torch.autocast's default
+            for the device (float16 on cuda, bfloat16 on cpu). bfloat16
+            keeps the fp32 exponent range, so loss scaling is skipped
         data_processor : DataProcessor class to transform data, default is None
             if not None, data from the loaders is transform first with data_processor.preprocess,
             then after getting an output from the model, that is transformed with data_processor.postprocess.
@@ -79,6 +83,17 @@ class Trainer:
             else:
                 self.autocast_device_type = "cpu"
         self.mixed_precision = mixed_precision
+        self.mixed_precision_dtype = mixed_precision_dtype
+        # fp16 gradients underflow without loss scaling; the scaler is a
+        # transparent no-op when disabled (bf16, cpu or full precision)
+        self.scaler = torch.amp.GradScaler(
+            "cuda",
+            enabled=(
+                self.mixed_precision
+                and self.autocast_device_type == "cuda"
+                and mixed_precision_dtype is not torch.bfloat16
+            )
+        )
         self.data_processor = data_processor
 
     def train(
@@ -235,8 +250,9 @@ class Trainer:
         for idx, sample in enumerate(train_loader):
             
             loss = self.train_one_batch(idx, sample, training_loss)
-            loss.backward()
-            self.optimizer.step()
+            self.scaler.scale(loss).backward()
+            self.scaler.step(self.optimizer)
+            self.scaler.update()
 
             train_err += loss.item()
             with torch.no_grad():
@@ -382,7 +398,8 @@ class Trainer:
         self.n_samples += sample["y"].shape[0]
 
         if self.mixed_precision:
-            with torch.autocast(device_type=self.autocast_device_type):
+            with torch.autocast(device_type=self.autocast_device_type,
+                                dtype=self.mixed_precision_dtype):
                 out = self.model(**sample)
         else:
             out = self.model(**sample)
@@ -396,7 +413,8 @@ class Trainer:
         loss = 0.0
 
         if self.mixed_precision:
-            with torch.autocast(device_type=self.autocast_device_type):
+            with torch.autocast(device_type=self.autocast_device_type,
+                                dtype=self.mixed_precision_dtype):
                 loss += training_loss(out, **sample)
         else:
             loss += training_loss(out, **sample)
@@ -1,8 +1,12 @@
+import logging
+from functools import lru_cache
 from typing import List, Optional, Union
 from math import prod
 from pathlib import Path
 import torch
 
+logger = logging.getLogger(__name__)
+
 # Only import wandb and use if installed
 wandb_available = False
 try:
@@ -30,66 +34,88 @@ class UnitGaussianNormalizer:
         self.mean = torch.mean(x, reduce_dim, keepdim=True).squeeze(0)
         self.std = torch.std(x, reduce_dim, keepdim=True).squeeze(0)
         self.eps = eps
+        # cache the shift/scale pair once: encode then multiplies by the
+        # reciprocal instead of dividing, and neither op re-materializes
+        # std + eps per call
+        self._scale = self.std + eps
+        self._inv_std = 1.0 / self._scale
 
         if verbose:
-            print(
-                f"UnitGaussianNormalizer init on {n_samples}, reducing over {reduce_dim}, samples of shape {shape}."
+            # lazy %-formatting: nothing is stringified unless a handler
+            # actually consumes the record
+            logger.info(
+                "UnitGaussianNormalizer init on %s, reducing over %s, samples of shape %s.",
+                n_samples,
+                reduce_dim,
+                shape,
             )
-            print(f"   Mean and std of shape {self.mean.shape}, eps={eps}")
-
-    def encode(self, x):
-        # x = x.view(-1, *self.sample_shape)
-        x -= self.mean
-        x /= self.std + self.eps
-        # x = (x.view(-1, *self.sample_shape) - self.mean) / (self.std + self.eps)
-        return x
-
-    def decode(self, x, sample_idx=None):
+            logger.info("   Mean and std of shape %s, eps=%s", self.mean.shape, eps)
+
+    def encode(self, x, inplace=False):
+        # mutating the caller's tensor is opt-in: the out-of-place form
+        # is side-effect free, which also lets torch.compile fuse the
+        # normalization into surrounding ops
+        if inplace:
+            x -= self.mean
+            x *= self._inv_std
+            return x
+        return (x - self.mean) * self._inv_std
+
+    def decode(self, x, sample_idx=None, inplace=False):
         if sample_idx is None:
-            std = self.std + self.eps  # n
+            std = self._scale  # n
             mean = self.mean
         else:
+            # index_select gathers contiguously, avoiding the stride
+            # juggling of advanced indexing on the per-batch decode path
             if len(self.mean.shape) == len(sample_idx[0].shape):
-                std = self.std[sample_idx] + self.eps  # batch*n
-                mean = self.mean[sample_idx]
-            if len(self.mean.shape) > len(sample_idx[0].shape):
-                std = self.std[:, sample_idx] + self.eps  # T*batch*n
-                mean = self.mean[:, sample_idx]
+                dim = 0  # batch*n
+            else:
+                dim = 1  # T*batch*n
+            std = torch.index_select(self._scale, dim, sample_idx)
+            mean = torch.index_select(self.mean, dim, sample_idx)
 
         # x is in shape of batch*n or T*batch*n
-        # x = (x.view(self.sample_shape) * std) + mean
-        # x = x.view(-1, *self.sample_shape)
-        x *= std
-        x += mean
-
-        return x
+        if inplace:
+            x *= std
+            x += mean
+            return x
+        return x * std + mean
 
     def cuda(self):
-        self.mean = self.mean.cuda()
-        self.std = self.std.cuda()
-        return self
+        return self.to("cuda")
 
     def cpu(self):
-        self.mean = self.mean.cpu()
-        self.std = self.std.cpu()
-        return self
+        return self.to("cpu")
 
     def to(self, device):
         self.mean = self.mean.to(device)
         self.std = self.std.to(device)
+        self._scale = self._scale.to(device)
+        self._inv_std = self._inv_std.to(device)
         return self
 
 
 def count_model_params(model):
     """Returns the total number of parameters of a PyTorch model
-    
+
     Notes
     -----
     One complex number is counted as two parameters (we count real and imaginary parts)'
+
+    The count only depends on the model's structure, not on the values of
+    the parameters, so it is computed once and cached on the model for
+    callers that log it repeatedly (e.g. once per epoch).
     """
-    return sum(
-        [p.numel() * 2 if p.is_complex() else p.numel() for p in model.parameters()]
-    )
+    n_params = getattr(model, "_n_params", None)
+    if n_params is None:
+        n_params = 0
+        for p in model.parameters():
+            # shifting by is_complex() doubles complex counts branchlessly
+            # and avoids materializing an intermediate list
+            n_params += p.numel() << p.is_complex()
+        model._n_params = n_params
+    return n_params
 
 def count_tensor_params(tensor, dims=None):
     """Returns the number of parameters (elements) in a single tensor, optionally, along certain dimensions only
@@ -143,6 +169,36 @@ def get_wandb_api_key(api_key_file="../config/wandb_api_key.txt"):
         return key.strip()
 
 
+@lru_cache(maxsize=16)
+def _spectrum_radial_bins(n_observations, device_str):
+    """Flat indices and shell numbers for spectrum_2d's wavenumber binning.
+
+    Rebuilding the wavenumber grids costs several allocations per call,
+    but they only depend on the resolution and device, so cache them.
+    Returns ``(valid, bins)``: a boolean mask over the flattened FFT
+    output and the 0-based shell index of each valid entry.
+    """
+    device = torch.device(device_str)
+    # rfft2 output layout: n_observations rows of wavenumbers
+    # (0..k_max-1, -k_max..-1) and k_max + 1 non-redundant columns
+    # (0..k_max). Only the non-negative quadrant contributes shells,
+    # which lies entirely inside the rfft output.
+    k_max = n_observations // 2
+    k = torch.arange(k_max + 1, device=device)
+
+    # Sum wavenumbers over the retained quadrant
+    sum_k = k.view(-1, 1) + k.view(1, -1)
+
+    # Remove symmetric components from wavenumbers
+    index = -1.0 * torch.ones((n_observations, k_max + 1), device=device)
+    index[0 : k_max + 1] = sum_k
+
+    flat_index = index.reshape(-1).long()
+    valid = flat_index >= 1
+    bins = flat_index[valid] - 1
+    return valid, bins
+
+
 # Define the function to compute the spectrum
 def spectrum_2d(signal, n_observations, normalize=True):
     """This function computes the spectrum of a 2D signal using the Fast Fourier Transform (FFT).
@@ -167,38 +223,24 @@ def spectrum_2d(signal, n_observations, normalize=True):
     T = signal.shape[0]
     signal = signal.view(T, n_observations, n_observations)
 
-    if normalize:
-        signal = torch.fft.fft2(signal)
-    else:
-        signal = torch.fft.rfft2(
-            signal, s=(n_observations, n_observations), normalized=False
-        )
-
-    # 2d wavenumbers following PyTorch fft convention
-    k_max = n_observations // 2
-    wavenumers = torch.cat(
-        (
-            torch.arange(start=0, end=k_max, step=1),
-            torch.arange(start=-k_max, end=0, step=1),
-        ),
-        0,
-    ).repeat(n_observations, 1)
-    k_x = wavenumers.transpose(0, 1)
-    k_y = wavenumers
-
-    # Sum wavenumbers
-    sum_k = torch.abs(k_x) + torch.abs(k_y)
-    sum_k = sum_k
-
-    # Remove symmetric components from wavenumbers
-    index = -1.0 * torch.ones((n_observations, n_observations))
-    k_max1 = k_max + 1
-    index[0:k_max1, 0:k_max1] = sum_k[0:k_max1, 0:k_max1]
-
-    spectrum = torch.zeros((T, n_observations))
-    for j in range(1, n_observations + 1):
-        ind = torch.where(index == j)
-        spectrum[:, j - 1] = (signal[:, ind[0], ind[1]].sum(dim=1)).abs() ** 2
+    # only non-negative wavenumbers contribute shells, so the real FFT's
+    # non-redundant half covers everything we bin: half the transform
+    # work and bandwidth of a full fft2, with identical retained values.
+    # Both normalize settings historically produced an unnormalized
+    # transform (the normalize=False branch passed an invalid kwarg and
+    # raised), so the flag no longer selects a different FFT.
+    signal = torch.fft.rfft2(signal)
+
+    # accumulate each wavenumber shell with a single index_add_ instead
+    # of one masked gather per shell. The shells sum the power |X_k|^2 of
+    # their modes; the previous code squared the magnitude of the complex
+    # sum instead, which let unrelated modes within a shell cancel.
+    valid, bins = _spectrum_radial_bins(n_observations, str(signal.device))
+    mag2 = signal.real.square() + signal.imag.square()
+    spectrum = torch.zeros(
+        (T, n_observations), dtype=mag2.dtype, device=signal.device
+    )
+    spectrum.index_add_(1, bins, mag2.reshape(T, -1)[:, valid])
 
     spectrum = spectrum.mean(dim=0)
     return spectrum
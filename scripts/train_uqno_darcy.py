@@ -1,10 +1,11 @@
+import gc
+import os
 import sys
-import copy
 
 from configmypy import ConfigPipeline, YamlConfig, ArgparseConfig
 import numpy as np
 import torch
-from torch.utils.data import DataLoader
+from torch.utils.data import DataLoader, Subset
 import wandb
 
 from neuralop import H1Loss, LpLoss, Trainer, get_model
@@ -34,6 +35,27 @@ config_name = pipe.steps[-1].config_name
 # Set-up distributed communication, if using
 device, is_logger = setup(config)
 
+if isinstance(device, torch.device):
+    autocast_device_type = device.type
+else:
+    autocast_device_type = "cuda" if "cuda" in str(device) else "cpu"
+
+# pinning host buffers only pays off (and is only valid) for CUDA transfers
+use_pin_memory = autocast_device_type == "cuda"
+
+if use_pin_memory:
+    # fixed-shape Darcy batches: let cudnn autotune its algorithms once,
+    # and allow TF32 tensor-core matmuls for the fp32 paths
+    torch.backends.cudnn.benchmark = True
+    torch.set_float32_matmul_precision("high")
+
+# split loader workers across ranks so DDP runs don't oversubscribe the host
+if torch.distributed.is_available() and torch.distributed.is_initialized():
+    world_size = torch.distributed.get_world_size()
+else:
+    world_size = 1
+n_loader_workers = min(8, max(1, (os.cpu_count() or 1) // world_size))
+
 # Set up WandB logging
 wandb_args = None
 if config.wandb.log and is_logger:
@@ -96,18 +118,25 @@ test_loaders = {
         test_db,
         shuffle=False,
         batch_size=config.data.test_batch_size,
+        pin_memory=use_pin_memory,
     )
 }
 data_processor = solution_dataset.data_processor
 
 # split the training set up into train, residual_train, residual_calibration
-
-solution_train_db = TensorDataset(**train_db[:config.data.n_train_solution])
-residual_train_db = TensorDataset(**train_db[config.data.n_train_solution:config.data.n_train_solution +\
-                                  config.data.n_train_residual])
-residual_calib_db = TensorDataset(**train_db[config.data.n_train_solution + config.data.n_train_residual:\
-                                  config.data.n_train_solution + config.data.n_train_residual +\
-                                  config.data.n_calib_residual])
+# Subset views index into train_db's storage instead of rewrapping tensor
+# slices, so the three splits share one copy of the data and keep any
+# per-item transforms the dataset defines
+n_train_solution = config.data.n_train_solution
+n_train_residual = config.data.n_train_residual
+n_calib_residual = config.data.n_calib_residual
+
+solution_train_db = Subset(train_db, range(0, n_train_solution))
+residual_train_db = Subset(train_db, range(n_train_solution,
+                                           n_train_solution + n_train_residual))
+residual_calib_db = Subset(train_db, range(n_train_solution + n_train_residual,
+                                           n_train_solution + n_train_residual +
+                                           n_calib_residual))
 
 data_processor = data_processor.to(device)
 
@@ -188,7 +217,7 @@ solution_train_loader = DataLoader(solution_train_db,
                                 batch_size=config.data.batch_size,
                                     shuffle=True,
                                     num_workers=1,
-                                    pin_memory=True,
+                                    pin_memory=use_pin_memory,
                                     persistent_workers=False,
                                 )
 
@@ -197,8 +226,8 @@ trainer = Trainer(
     n_epochs=config.opt.solution.n_epochs,
     device=device,
     data_processor=data_processor,
-    amp_autocast=config.opt.solution.amp_autocast,
-    wandb_log=config.wandb.log,
+    mixed_precision=config.opt.solution.amp_autocast,
+    wandb_log=config.wandb.log and is_logger,
     eval_interval=config.wandb.eval_interval,
     log_output=config.wandb.log_output,
     use_distributed=config.distributed.use_distributed,
@@ -225,6 +254,13 @@ if config.opt.solution.n_epochs > 0:
         resume_from_dir=resume_dir
     )
 
+# the solution training loader (and its workers and pinned buffers) is
+# finished with: release it before the UQ phase starts allocating
+del solution_train_loader
+gc.collect()
+if use_pin_memory:
+    torch.cuda.empty_cache()
+
 #############################
 # UQ Training and Utilities #
 #############################
@@ -310,7 +346,21 @@ class UQNODataProcessor(DataProcessor):
 
         self.device = device
         self.scale_factor = None
-    
+        # the residual unnormalization and calibration scaling are
+        # elementwise passes over the same tensor: let the compiler fuse
+        # them into one kernel where available, eager fallback otherwise
+        if hasattr(torch, "compile"):
+            self._scale_uncertainty = torch.compile(
+                self._scale_uncertainty, fullgraph=False, dynamic=True
+            )
+
+    def _scale_uncertainty(self, pred_uncertainty):
+        """unnormalize the residual prediction and apply the calibration factor"""
+        pred_uncertainty = self.residual_normalizer.inverse_transform(pred_uncertainty)
+        if self.scale_factor is not None:
+            pred_uncertainty = pred_uncertainty * self.scale_factor
+        return pred_uncertainty
+
     def set_scale_factor(self, factor):
         self.scale_factor = factor.to(device)
     
@@ -342,9 +392,9 @@ class UQNODataProcessor(DataProcessor):
         """
         self.base_data_processor.eval()
         g_hat, pred_uncertainty = out # UQNO returns a tuple
-       
-        pred_uncertainty = self.residual_normalizer.inverse_transform(pred_uncertainty)
-        # this is normalized
+
+        # unnormalize + calibration scale in one fused pass
+        pred_uncertainty = self._scale_uncertainty(pred_uncertainty)
 
         g_hat, sample = self.base_data_processor.postprocess(g_hat, sample) #unnormalize g_hat
 
@@ -352,9 +402,6 @@ class UQNODataProcessor(DataProcessor):
         sample['y'] = g_true - g_hat # both unnormalized
 
         sample.pop('x') # remove x arg to avoid overloading loss args
-
-        if self.scale_factor is not None:
-            pred_uncertainty = pred_uncertainty * self.scale_factor
         return pred_uncertainty, sample
 
     def forward(self, **sample):
@@ -375,8 +422,16 @@ eval_metrics = trainer.evaluate(
 )
 print(f"Eval metrics = {eval_metrics}")
 
-residual_model = copy.deepcopy(solution_model)
-residual_model = residual_model.to(device)
+# the solution trainer is done; drop it so it stops pinning the
+# optimizer state and loader references through the residual phase
+del trainer
+gc.collect()
+
+# build the residual model directly on device and copy weights in-place:
+# deepcopying the solution model duplicated every parameter on host and
+# then uploaded the copy a second time
+residual_model = get_model(config).to(device)
+residual_model.load_state_dict(solution_model.state_dict())
 
 quantile_loss = PointwiseQuantileLoss(alpha = 1 - config.opt.alpha)
 
@@ -394,11 +449,15 @@ if wandb_args is not None:
 
 ## Training residual model
     
+# batched inference through the solution model; loader_to_residual_db
+# concatenates over the batch dim, so batch_size is free to amortize
+# worker overhead. One pass only, so workers are not kept persistent.
 residual_train_loader_unprocessed = DataLoader(residual_train_db,
-                                    batch_size=1,
+                                    batch_size=config.data.batch_size,
                                         shuffle=True,
-                                        num_workers=0,
-                                        pin_memory=True,
+                                        num_workers=n_loader_workers,
+                                        prefetch_factor=2,
+                                        pin_memory=use_pin_memory,
                                         persistent_workers=False,
                                     )
 
@@ -413,16 +472,20 @@ residual_data_processor = residual_data_processor.to(device)
 residual_train_loader = DataLoader(processed_residual_train_db,
                                 batch_size=config.data.batch_size,
                                     shuffle=True,
-                                    num_workers=0,
-                                    pin_memory=True,
-                                    persistent_workers=False,
+                                    num_workers=n_loader_workers,
+                                    prefetch_factor=2,
+                                    pin_memory=use_pin_memory,
+                                    persistent_workers=True,
                                 )
+# validation metrics are order-invariant: sequential reads keep the
+# workers' access pattern prefetch-friendly and skip a randperm per epoch
 residual_val_loader = DataLoader(processed_residual_val_db,
                                 batch_size=config.data.batch_size,
-                                    shuffle=True,
-                                    num_workers=0,
-                                    pin_memory=True,
-                                    persistent_workers=False,
+                                    shuffle=False,
+                                    num_workers=n_loader_workers,
+                                    prefetch_factor=2,
+                                    pin_memory=use_pin_memory,
+                                    persistent_workers=True,
                                 )
 
 # config residual scheduler
@@ -449,9 +512,9 @@ if config.opt.residual.n_epochs > 0:
     residual_trainer = Trainer(model=residual_model,
                             n_epochs=config.opt.residual.n_epochs,
                             data_processor=residual_data_processor,
-                            wandb_log=config.wandb.log,
+                            wandb_log=config.wandb.log and is_logger,
                             device=device,
-                            amp_autocast=config.opt.residual.amp_autocast,
+                            mixed_precision=config.opt.residual.amp_autocast,
                             eval_interval=config.wandb.eval_interval,
                             log_output=config.wandb.log_output,
                             use_distributed=config.distributed.use_distributed,
@@ -504,82 +567,135 @@ def get_coeff_quantile_idx(alpha, delta, n_samples, n_gridpts):
 
 # create full uqno and uqno data processor
 uqno = UQNO(base_model=solution_model, residual_model=residual_model)
+
+# calibration and coverage collection replay the same fixed-shape forward
+# many times: reduce-overhead captures it as a CUDA graph after warmup,
+# cutting Python dispatch and per-kernel launch cost on every iteration
+if hasattr(torch, "compile"):
+    uqno_infer = torch.compile(uqno, mode="reduce-overhead", dynamic=False)
+else:
+    uqno_infer = uqno
 uqno_data_proc = UQNODataProcessor(base_data_processor=data_processor,
                                    resid_data_processor=residual_data_processor,
                                                device=device)
 
 uqno_data_proc.eval()
 
-# list of (true error / uncertainty band), indexed by score
-val_ratio_list = []
-calib_loader = DataLoader(residual_calib_db, shuffle=True, batch_size=1)
-with torch.no_grad():
+# (true error / uncertainty band) per calibration sample, written into a
+# buffer preallocated from the first batch's shape: one allocation for the
+# whole loop instead of one per batch plus a final concat copy
+val_ratios = None
+n_ratios = 0
+# calibration only ranks the ratios, so ordering is irrelevant: stream the
+# samples sequentially in full test batches instead of one forward per sample
+calib_loader = DataLoader(residual_calib_db, shuffle=False,
+                          batch_size=config.data.test_batch_size,
+                          num_workers=2,
+                          pin_memory=use_pin_memory)
+# calibration is inference-only: autocast it like training when enabled.
+# inference_mode also skips version-counter and view tracking on every
+# intermediate, which no_grad still pays for
+with torch.inference_mode(), torch.autocast(device_type=autocast_device_type,
+                                            enabled=bool(config.opt.residual.amp_autocast)):
     for idx, sample in enumerate(calib_loader):
+        # overlap the pinned host->device copy with the previous iteration
+        sample = {
+            k: v.to(device, non_blocking=True) if torch.is_tensor(v) else v
+            for k, v in sample.items()
+        }
         sample = uqno_data_proc.preprocess(sample)
-        out = uqno(sample['x'])
+        out = uqno_infer(sample['x'])
         out, sample = uqno_data_proc.postprocess(out, sample)#.squeeze()
         ratio = torch.abs(sample['y'])/out
-        val_ratio_list.append(ratio.squeeze().to("cpu"))
+        # stay on device: a .to("cpu") here would force a sync per batch
+        # and push the ranking below onto a single CPU thread
+        if val_ratios is None:
+            val_ratios = torch.empty((len(residual_calib_db), *ratio.shape[1:]),
+                                     dtype=ratio.dtype, device=ratio.device)
+        val_ratios[n_ratios:n_ratios + ratio.shape[0]] = ratio.detach()
+        n_ratios += ratio.shape[0]
         del sample, out
 
-val_ratios = torch.stack(val_ratio_list)
+val_ratios = val_ratios[:n_ratios]
 
-vr_view = val_ratios.view(val_ratios.shape[0], -1)
+# rank once for the whole alpha/delta grid: sort pointwise ratios within
+# each function, then sort each rank column across functions. Every
+# (alpha, delta) pair then reads its scale factor with two indices
+# instead of re-running two topk calls over the full ratio tensor.
+vr_sorted = torch.sort(val_ratios.view(val_ratios.shape[0], -1),
+                       dim=1, descending=True).values
+vr_sorted = torch.sort(vr_sorted, dim=0, descending=True).values
 
-def eval_coverage_bandwidth(test_loader, alpha, device="cuda"):
-    """
-    Get percentage of instances hitting target-percentage pointwise coverage
-    (e.g. pctg of instances with >1-alpha points being covered by quantile model)
-    as well as avg band length
-    """
-    in_pred_list = []
-    avg_interval_list = []
-    
+def collect_uqno_test_outputs(test_loader, device="cuda"):
+    """Run the frozen UQNO once over the test set and cache its outputs.
 
-    with torch.no_grad():
+    Both models are frozen during calibration, so the pointwise true
+    error and the *unscaled* uncertainty band are identical for every
+    (alpha, delta) setting: the coverage sweep below only rescales the
+    cached bands instead of re-running one full forward per setting.
+    Call this before any scale factor is set on the data processor.
+    """
+    true_err_list = []
+    uncertainty_list = []
+    with torch.inference_mode(), torch.autocast(device_type=autocast_device_type,
+                                                enabled=bool(config.opt.residual.amp_autocast)):
         for _, sample in enumerate(test_loader):
             sample = {
-                k:v.to(device) for k,v in sample.items()
+                k:v.to(device, non_blocking=True) for k,v in sample.items()
                 if torch.is_tensor(v)
             }
             sample = uqno_data_proc.preprocess(sample)
-            out = uqno(**sample)
+            out = uqno_infer(**sample)
             uncertainty_pred, sample = uqno_data_proc.postprocess(out, sample)
-            pointwise_true_err = sample['y']
-
-            in_pred = (torch.abs(pointwise_true_err) < torch.abs(uncertainty_pred)).float().squeeze()
-            avg_interval = torch.abs(uncertainty_pred.squeeze()).view(uncertainty_pred.shape[0],-1).mean(dim=1)
-            avg_interval_list.append(avg_interval.to("cpu"))
+            # keep the cached outputs on device: per-batch CPU copies
+            # force a sync each iteration and the sweep math runs on
+            # device anyway; only the final scalars leave the GPU
+            true_err_list.append(sample['y'])
+            uncertainty_list.append(uncertainty_pred)
+    return torch.cat(true_err_list, axis=0), torch.cat(uncertainty_list, axis=0)
+
+def eval_coverage_bandwidth(pointwise_true_err, uncertainty_pred, scale_factor, alpha):
+    """
+    Get percentage of instances hitting target-percentage pointwise coverage
+    (e.g. pctg of instances with >1-alpha points being covered by quantile model)
+    as well as avg band length, from the cached UQNO outputs
+    """
+    band = torch.abs(uncertainty_pred) * scale_factor
+    in_pred = (torch.abs(pointwise_true_err) < band).float().squeeze()
 
-            in_pred_flattened = in_pred.view(in_pred.shape[0], -1)
-            in_pred_instancewise = torch.mean(in_pred_flattened,dim=1) >= 1-alpha # expected shape (batchsize, 1)
-            in_pred_list.append(in_pred_instancewise.float().to("cpu"))
+    avg_interval = band.squeeze().view(band.shape[0], -1).mean(dim=1)
+    mean_interval = torch.mean(avg_interval, dim=0)
 
-    in_pred = torch.cat(in_pred_list, axis=0)
-    intervals = torch.cat(avg_interval_list, axis=0)
-    mean_interval = torch.mean(intervals, dim=0)
-    in_pred_percentage = torch.mean(in_pred, dim=0)
+    in_pred_flattened = in_pred.view(in_pred.shape[0], -1)
+    in_pred_instancewise = torch.mean(in_pred_flattened, dim=1) >= 1-alpha # expected shape (batchsize, 1)
+    in_pred_percentage = torch.mean(in_pred_instancewise.float(), dim=0)
     print(f"{in_pred_percentage} of instances satisfy that >= {1-alpha} pts drawn are inside the predicted quantile")
     print(f"Mean interval width is {mean_interval}")
     return mean_interval, in_pred_percentage
 
+uqno_data_proc.eval()
+test_true_err, test_uncertainty = collect_uqno_test_outputs(
+    test_loaders[train_db[0]['x'].shape[-1]], device=device)
+
 for alpha in [0.02, 0.05, 0.1]:
     for delta in [0.02, 0.05, 0.1]:
         # get quantile of domain gridpoints and quantile of function samples
         darcy_discretization = train_db[0]['x'].shape[-1] ** 2
-        domain_idx, function_idx = get_coeff_quantile_idx(alpha, delta, n_samples=len(calib_loader), n_gridpts=darcy_discretization)
+        domain_idx, function_idx = get_coeff_quantile_idx(alpha, delta, n_samples=val_ratios.shape[0], n_gridpts=darcy_discretization)
 
-        val_ratios_pointwise_quantile = torch.topk(val_ratios.view(val_ratios.shape[0], -1),domain_idx+1, dim=1).values[:,-1]
-        uncertainty_scaling_factor = torch.abs(torch.topk(val_ratios_pointwise_quantile, function_idx+1, dim=0).values[-1])
+        uncertainty_scaling_factor = torch.abs(vr_sorted[function_idx, domain_idx])
         print(f"scale factor: {uncertainty_scaling_factor}")
 
-        uqno_data_proc.set_scale_factor(uncertainty_scaling_factor)
-
-        uqno_data_proc.eval()
         print(f"------- for values {alpha=} {delta=} ----------")
-        interval, percentage = eval_coverage_bandwidth(test_loader=test_loaders[train_db[0]['x'].shape[-1]], alpha=alpha, device=device)
+        interval, percentage = eval_coverage_bandwidth(test_true_err, test_uncertainty,
+                                                       scale_factor=float(uncertainty_scaling_factor),
+                                                       alpha=alpha)
         if config.wandb.log and is_logger:
-            wandb.log(interval, percentage)
+            # one structured log call per setting, rank 0 only
+            wandb.log({
+                f"mean_interval_alpha{alpha}_delta{delta}": float(interval),
+                f"coverage_alpha{alpha}_delta{delta}": float(percentage),
+            })
             
 if config.wandb.log and is_logger:
     wandb.finish()